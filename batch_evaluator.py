@@ -0,0 +1,176 @@
+from AlgorithmImports import *
+import itertools
+import math
+import numpy as np
+
+# Parameters that only change thresholds and sizing, not indicator lengths
+SWEEP_PARAMS = ('adx_thresh', 'rsi_ob', 'rsi_os', 'atr_threshold_mult', 'volume_requirement',
+                'low_volume_qty', 'high_volume_qty', 'max_bars_in_trade')
+
+
+class BatchEvaluator:
+    """Пакетная оценка конфигураций (config × bar) по одной записи индикаторов из телеметрии"""
+
+    def __init__(self, columns, config, point_value=50.0):
+        self.config = config
+        self.point_value = point_value
+
+        # Только бары, где индикаторы были готовы и записаны
+        valid = ~np.isnan(columns['adx'])
+        self.bar_index = columns['bar_index'][valid]
+        self.open = columns['open'][valid]
+        self.close = columns['close'][valid]
+        self.atr = columns['atr'][valid]
+        self.avg_atr = columns['avg_atr'][valid]
+        self.adx = columns['adx'][valid]
+        self.rsi = columns['rsi'][valid]
+        self.pre_volume = columns['pre_volume'][valid]
+
+        # Был ли объем уже проверен в main.on_data на момент бара
+        self.volume_checked = columns['volume_checked'][valid]
+
+        volume_high = (self.pre_volume >= config.volume_requirement) & self.volume_checked
+        mismatches = int(np.count_nonzero(volume_high != columns['volume_high'][valid]))
+        if mismatches:
+            raise ValueError(f"volume_high differs from the recorded column on {mismatches} bars")
+
+        # Флаги, не зависящие от порогов, считаются один раз
+        close = self.close
+        self.bull_low = (close > columns['st_low'][valid]) & (close > columns['sar_low'][valid])
+        self.bear_low = (close < columns['st_low'][valid]) & (close < columns['sar_low'][valid])
+        self.bull_high = (close > columns['st_high'][valid]) & (close > columns['sar_high'][valid])
+        self.bear_high = (close < columns['st_high'][valid]) & (close < columns['sar_high'][valid])
+        self.below_bb = close < columns['bb_lower'][valid]
+        self.above_bb = close > columns['bb_upper'][valid]
+        self.up_candle = close > self.open
+        self.down_candle = close < self.open
+
+    @staticmethod
+    def grid(**values):
+        """Строит декартово произведение значений параметров (как в config.py, до масштабирования)"""
+        unknown = set(values) - set(SWEEP_PARAMS)
+        if unknown:
+            raise ValueError(f"Not a threshold parameter: {sorted(unknown)}")
+
+        names = list(values)
+        return [dict(zip(names, combo)) for combo in itertools.product(*(values[name] for name in names))]
+
+    def _scale_param(self, name, value):
+        """Масштабирует значение под таймфрейм так же, как TradingConfig"""
+        if name == 'max_bars_in_trade' and self.config.timeframe > 1:
+            return max(2, int(value / math.sqrt(self.config.timeframe)))
+        return value
+
+    def _param_column(self, param_sets, name):
+        """Значения параметра для всех конфигураций в виде колонки (C, 1)"""
+        default = getattr(self.config, name)
+        values = [self._scale_param(name, params[name]) if name in params else default for params in param_sets]
+        return np.array(values, dtype=np.float64)[:, None]
+
+    def calculate_signals(self, param_sets):
+        """Рассчитывает сигналы для всех конфигураций, массивы формы (C, T)"""
+        adx_thresh = self._param_column(param_sets, 'adx_thresh')
+        rsi_ob = self._param_column(param_sets, 'rsi_ob')
+        rsi_os = self._param_column(param_sets, 'rsi_os')
+        atr_mult = self._param_column(param_sets, 'atr_threshold_mult')
+        volume_requirement = self._param_column(param_sets, 'volume_requirement')
+
+        active = self.atr[None, :] > self.avg_atr[None, :] * atr_mult
+        is_trending = self.adx[None, :] > adx_thresh
+        volume_high = (self.pre_volume[None, :] >= volume_requirement) & self.volume_checked[None, :]
+
+        trend_long = is_trending & np.where(volume_high, self.bull_high, self.bull_low)
+        trend_short = is_trending & np.where(volume_high, self.bear_high, self.bear_low)
+
+        # Предыдущий бар — последний бар, прошедший фильтр ATR для этой конфигурации
+        positions = np.arange(self.close.size)
+        last_active = np.maximum.accumulate(np.where(active, positions, -1), axis=1)
+        previous = np.concatenate([np.full((len(param_sets), 1), -1), last_active[:, :-1]], axis=1)
+        has_previous = previous >= 0
+        bullish_reversal = self.up_candle & has_previous & self.down_candle[previous]
+        bearish_reversal = self.down_candle & has_previous & self.up_candle[previous]
+
+        mean_rev_long = ~is_trending & self.below_bb & (self.rsi[None, :] < rsi_os) & bullish_reversal
+        mean_rev_short = ~is_trending & self.above_bb & (self.rsi[None, :] > rsi_ob) & bearish_reversal
+
+        return {
+            'active': active,
+            'volume_high': volume_high,
+            'trend_long': trend_long,
+            'trend_short': trend_short,
+            'mean_rev_long': mean_rev_long,
+            'mean_rev_short': mean_rev_short,
+        }
+
+    def evaluate(self, param_sets):
+        """Симулирует позиции для всех конфигураций и возвращает статистику сделок"""
+        signals = self.calculate_signals(param_sets)
+        low_qty = self._param_column(param_sets, 'low_volume_qty')[:, 0]
+        high_qty = self._param_column(param_sets, 'high_volume_qty')[:, 0]
+        max_bars = self._param_column(param_sets, 'max_bars_in_trade')[:, 0]
+
+        n_configs = len(param_sets)
+        qty = np.zeros(n_configs)
+        entry_price = np.zeros(n_configs)
+        is_mr = np.zeros(n_configs, dtype=bool)
+        long_mr_bar = np.full(n_configs, -1, dtype=np.int64)
+        short_mr_bar = np.full(n_configs, -1, dtype=np.int64)
+
+        stats = {name: np.zeros(n_configs) for name in (
+            'trade_counter', 'winning_trades', 'losing_trades', 'total_pnl',
+            'trend_trades', 'mr_trades', 'trend_pnl', 'mr_pnl')}
+
+        # Цикл по барам, векторно по конфигурациям
+        for t in range(self.close.size):
+            active = signals['active'][:, t]
+            trend_long = signals['trend_long'][:, t]
+            trend_short = signals['trend_short'][:, t]
+            mean_rev_long = signals['mean_rev_long'][:, t]
+            mean_rev_short = signals['mean_rev_short'][:, t]
+            price = self.close[t]
+            bar_index = self.bar_index[t]
+
+            # Выходы
+            is_long = active & (qty > 0)
+            is_short = active & (qty < 0)
+            exit_long = is_long & ~trend_long & ~mean_rev_long
+            exit_short = is_short & ~trend_short & ~mean_rev_short
+            long_mr_bar[exit_long] = -1
+            short_mr_bar[exit_short] = -1
+
+            timeout_long = is_long & (long_mr_bar >= 0) & (bar_index - long_mr_bar >= max_bars)
+            timeout_short = is_short & (short_mr_bar >= 0) & (bar_index - short_mr_bar >= max_bars)
+            long_mr_bar[timeout_long] = -1
+            short_mr_bar[timeout_short] = -1
+
+            closing = exit_long | exit_short | timeout_long | timeout_short
+            if closing.any():
+                pnl = np.where(closing, (price - entry_price) * qty * self.point_value, 0.0)
+                stats['trade_counter'] += closing
+                stats['winning_trades'] += closing & (pnl > 0)
+                stats['losing_trades'] += closing & (pnl <= 0)
+                stats['total_pnl'] += pnl
+                stats['mr_trades'] += closing & is_mr
+                stats['trend_trades'] += closing & ~is_mr
+                stats['mr_pnl'] += np.where(is_mr, pnl, 0.0)
+                stats['trend_pnl'] += np.where(is_mr, 0.0, pnl)
+
+            # Входы (по позиции на начало бара, как в TradingLogic)
+            flat = active & (qty == 0)
+            enter_long = flat & (trend_long | mean_rev_long)
+            enter_short = flat & ~enter_long & (trend_short | mean_rev_short)
+            entering = enter_long | enter_short
+            size = np.where(signals['volume_high'][:, t], high_qty, low_qty)
+
+            long_mr_bar[enter_long & mean_rev_long] = bar_index
+            short_mr_bar[enter_short & mean_rev_short] = bar_index
+            is_mr = np.where(entering, (enter_long & mean_rev_long) | (enter_short & mean_rev_short), is_mr)
+            entry_price = np.where(entering, price, entry_price)
+            qty = np.where(closing, 0.0, qty)
+            qty = np.where(enter_long, size, np.where(enter_short, -size, qty))
+
+        # Открытые позиции оцениваются по последней цене
+        last_price = self.close[-1] if self.close.size else 0.0
+        stats['open_pnl'] = (last_price - entry_price) * qty * self.point_value
+        stats['open_qty'] = qty
+        return stats
@@ -64,6 +64,14 @@ class TradingConfig:
         self.debug_on_changes_only = False
         self.significant_change_threshold = 0.0005
 
+        # === Telemetry (one columnar row per processed bar) ===
+        self.telemetry_enabled = False
+        self.telemetry_buffer_size = 4096
+        self.telemetry_format = "npy"  # "npy" or "parquet"
+        self.telemetry_key_prefix = "telemetry"
+        # Per-bar debug lines; telemetry rows replace them when it is enabled
+        self.debug_bars = not self.telemetry_enabled
+
         # We scale the parameters to the timeframe if it is greater than 1
         if self.timeframe > 1:
             scaling_factor = math.sqrt(self.timeframe)
@@ -6,6 +6,8 @@ from zoneinfo import ZoneInfo
 from config import TradingConfig
 from indicators import IndicatorManager
 from trading_logic import TradingLogic
+from telemetry import (BarTelemetry, GATE_BAD_PRICE, GATE_SYMBOL_NOT_READY, GATE_ATR,
+                       GATE_INDICATORS_NOT_READY, GATE_OUT_OF_SESSION, GATE_NO_DATA)
 
 class SupertrendSarAlgorithm(QCAlgorithm):
     def initialize(self) -> None:
@@ -18,6 +20,7 @@ class SupertrendSarAlgorithm(QCAlgorithm):
         self.config = TradingConfig(timeframe=5)
         self.indicators = IndicatorManager(self, self.config)
         self.trading_logic = TradingLogic(self, self.config, self.indicators)
+        self.telemetry = BarTelemetry(self, self.config) if self.config.telemetry_enabled else None
 
         #=== Futures Subscription ===
         future = self.add_future(
@@ -41,6 +44,7 @@ class SupertrendSarAlgorithm(QCAlgorithm):
         self._last_trade_date = None
         self.pre_volume = 0
         self.volume_high = False
+        self.volume_checked = False
         self.consolidated_bars = {}
         
         # Прогрев
@@ -71,12 +75,14 @@ class SupertrendSarAlgorithm(QCAlgorithm):
         
         bar_time = consolidated_bar.end_time.astimezone(self.ct).time()
         if not self.is_time_in_session(consolidated_bar.end_time):
+            self.record_skipped_bar(consolidated_bar.end_time, consolidated_bar, GATE_OUT_OF_SESSION)
             return
         
         if not self.indicators.all_indicators_ready():
+            self.record_skipped_bar(consolidated_bar.end_time, consolidated_bar, GATE_INDICATORS_NOT_READY)
             return
         
-        if self.config.debug_flags:
+        if self.config.debug_flags and self.config.debug_bars:
             self.debug(f"ОБРАБОТКА КОНСОЛИДИРОВАННОГО БАРА: {bar_time:%H:%M} | Цена: {consolidated_bar.close}")
         
         self.process_trading_logic(consolidated_bar)
@@ -112,6 +118,7 @@ class SupertrendSarAlgorithm(QCAlgorithm):
         if self._last_trade_date is None or current_date != self._last_trade_date:
             self.pre_volume = 0
             self.volume_high = False
+            self.volume_checked = False
             self._last_trade_date = current_date
             if self.config.debug_flags:
                 self.debug(f"НОВЫЙ ТОРГОВЫЙ ДЕНЬ: {current_date}")
@@ -148,11 +155,12 @@ class SupertrendSarAlgorithm(QCAlgorithm):
             if data.bars.contains_key(contract):
                 bar = data.bars[contract]
                 self.pre_volume += bar.volume
-                if self.config.debug_flags:
+                if self.config.debug_flags and self.config.debug_bars:
                     self.debug(f"PRE-MARKET VOLUME: {self.pre_volume} | Current bar: {bar.volume}")
         elif now > self.config.pre_end and not self.volume_high:
             self.volume_high = (self.pre_volume >= self.config.volume_requirement)
-            if self.config.debug_flags:
+            self.volume_checked = True
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug(f"VOLUME CHECK: {self.pre_volume} >= {self.config.volume_requirement} = {self.volume_high}")
         
         # Настройка консолидаторов или индикаторов
@@ -167,46 +175,79 @@ class SupertrendSarAlgorithm(QCAlgorithm):
         self.bar_index += 1
         
         if not (self.config.session_start <= now <= self.config.session_end):
+            bar = data.bars[contract] if data.bars.contains_key(contract) else None
+            self.record_skipped_bar(self.time, bar, GATE_OUT_OF_SESSION)
             return
         
         if not data.bars.contains_key(contract):
-            if self.config.debug_flags:
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug(f"NO DATA FOR CONTRACT: {contract}")
+            self.record_skipped_bar(self.time, None, GATE_NO_DATA)
             return
         
+        bar = data.bars[contract]
+        
         if not self.can_trade_symbol(contract):
-            if self.config.debug_flags:
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug(f"SYMBOL NOT READY FOR TRADING: {contract}")
+            self.record_skipped_bar(bar.end_time, bar, GATE_SYMBOL_NOT_READY)
             return
         
-        bar = data.bars[contract]
-        
         if not self.indicators.all_indicators_ready():
+            self.record_skipped_bar(bar.end_time, bar, GATE_INDICATORS_NOT_READY)
             return
         
         self.process_trading_logic(bar)
 
+    def current_quantity(self):
+        """Текущая позиция по активному контракту"""
+        return self.portfolio[self.current_contract_symbol].quantity if self.current_contract_symbol else 0
+
+    def record_skipped_bar(self, end_time, bar, gate):
+        """Записывает в телеметрию бар, отброшенный до торговой логики"""
+        if self.telemetry:
+            self.telemetry.begin_bar(end_time, bar, self.bar_index, self.pre_volume, self.volume_high,
+                                     self.volume_checked, self.current_quantity())
+            self.telemetry.record_gate(gate)
+
     def process_trading_logic(self, bar):
         """Основная торговая логика"""
+        current_qty = self.current_quantity()
+
+        if self.telemetry:
+            self.telemetry.begin_bar(bar.end_time, bar, self.bar_index, self.pre_volume, self.volume_high,
+                                     self.volume_checked, current_qty)
+
         if bar.close == 0:
-            if self.config.debug_flags:
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug(f"THE BAR IS NOT CORRECTLY PRICED: {bar.close}")
+            if self.telemetry:
+                self.telemetry.record_gate(GATE_BAD_PRICE)
             return
         
         if not self.can_trade_symbol(self.current_contract_symbol):
-            if self.config.debug_flags:
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug(f"CONTRACT NOT READY FOR TRADE: {self.current_contract_symbol}")
+            if self.telemetry:
+                self.telemetry.record_gate(GATE_SYMBOL_NOT_READY)
             return
+
+        if self.telemetry:
+            self.telemetry.record_indicators(self.indicators)
         
         # Проверка волатильности
         if not self.indicators.check_atr_condition():
-            if self.config.debug_flags:
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug("ATR condition not met - skip trading")
+            if self.telemetry:
+                self.telemetry.record_gate(GATE_ATR)
             return
         
         if not self.indicators.all_indicators_ready():
-            if self.config.debug_flags:
+            if self.config.debug_flags and self.config.debug_bars:
                 self.debug("INDICATORS NOT READY")
+            if self.telemetry:
+                self.telemetry.record_gate(GATE_INDICATORS_NOT_READY)
             return
 
         now = bar.end_time.astimezone(self.ct).time()
@@ -215,16 +256,19 @@ class SupertrendSarAlgorithm(QCAlgorithm):
         is_trending = adx_val > self.config.adx_thresh
 
         # Получение сигналов
-        current_qty = self.portfolio[self.current_contract_symbol].quantity if self.current_contract_symbol else 0
         signals = self.trading_logic.calculate_signals(bar, current_qty, self.volume_high, adx_val, is_trending)
         
-        if self.config.debug_flags:
+        if self.config.debug_flags and self.config.debug_bars:
             self.debug(f"ТОРГОВЫЙ БАР: {now:%H:%M} | Цена: {price:.2f} | ADX: {adx_val:.2f} | "
                       f"Trending: {is_trending} | Vol: {self.volume_high} | Pos: {current_qty}")
 
         # Выполнение сделок
-        self.trading_logic.execute_entries(signals, current_qty, self.volume_high, self.bar_index, self.current_contract_symbol)
-        self.trading_logic.execute_exits(signals, current_qty, self.bar_index, self.current_contract_symbol)
+        action = self.trading_logic.execute_entries(signals, current_qty, self.volume_high, self.bar_index, self.current_contract_symbol)
+        action |= self.trading_logic.execute_exits(signals, current_qty, self.bar_index, self.current_contract_symbol)
+
+        if self.telemetry:
+            self.telemetry.record_signals(signals, is_trending)
+            self.telemetry.record_action(action)
 
         # Статистика каждые 30 минут/баров
         if (self.config.timeframe == 1 and bar.end_time.minute % 30 == 0) or \
@@ -254,3 +298,8 @@ class SupertrendSarAlgorithm(QCAlgorithm):
             
             self.current_contract_symbol = new_symbol
             self._contract_just_changed = True
+
+    def on_end_of_algorithm(self) -> None:
+        """Сброс оставшейся телеметрии по окончании бэктеста"""
+        if self.telemetry:
+            self.telemetry.flush()
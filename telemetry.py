@@ -0,0 +1,203 @@
+from AlgorithmImports import *
+import io
+import json
+from datetime import datetime, timezone
+import numpy as np
+
+from trading_logic import ACTION_NONE
+
+__all__ = [
+    'GATE_NONE', 'GATE_BAD_PRICE', 'GATE_SYMBOL_NOT_READY', 'GATE_ATR', 'GATE_INDICATORS_NOT_READY',
+    'GATE_OUT_OF_SESSION', 'GATE_NO_DATA',
+    'BarTelemetry', 'load_telemetry',
+]
+
+# === Gates: the check that short-circuited the bar ===
+GATE_NONE = 0
+GATE_BAD_PRICE = 1
+GATE_SYMBOL_NOT_READY = 2
+GATE_ATR = 3
+GATE_INDICATORS_NOT_READY = 4
+GATE_OUT_OF_SESSION = 5
+GATE_NO_DATA = 6
+
+# Column name -> (dtype, default value for a fresh row)
+# 'time' is the bar end in algorithm time, stored naive (time zone dropped, wall clock kept)
+# 'action' holds the ACTION_* bit flags returned by TradingLogic
+COLUMNS = {
+    'time': ('datetime64[ns]', np.datetime64('NaT')),
+    'bar_index': (np.int64, -1),
+    'open': (np.float64, np.nan),
+    'close': (np.float64, np.nan),
+    'atr': (np.float64, np.nan),
+    'avg_atr': (np.float64, np.nan),
+    'adx': (np.float64, np.nan),
+    'st_low': (np.float64, np.nan),
+    'st_high': (np.float64, np.nan),
+    'sar_low': (np.float64, np.nan),
+    'sar_high': (np.float64, np.nan),
+    'rsi': (np.float64, np.nan),
+    'bb_lower': (np.float64, np.nan),
+    'bb_upper': (np.float64, np.nan),
+    'pre_volume': (np.float64, np.nan),
+    'volume_high': (np.bool_, False),
+    'volume_checked': (np.bool_, False),
+    'is_trending': (np.bool_, False),
+    'current_qty': (np.int64, 0),
+    'trend_long': (np.bool_, False),
+    'trend_short': (np.bool_, False),
+    'mean_rev_long': (np.bool_, False),
+    'mean_rev_short': (np.bool_, False),
+    'bullish_reversal': (np.bool_, False),
+    'bearish_reversal': (np.bool_, False),
+    'gate': (np.int8, GATE_NONE),
+    'action': (np.int16, ACTION_NONE),
+}
+
+SIGNAL_COLUMNS = ('trend_long', 'trend_short', 'mean_rev_long', 'mean_rev_short',
+                  'bullish_reversal', 'bearish_reversal')
+
+
+class BarTelemetry:
+    """Колоночная запись диагностики: одна строка на обработанный бар"""
+
+    def __init__(self, algorithm, config):
+        self.algo = algorithm
+        self.config = config
+        self.capacity = config.telemetry_buffer_size
+        self.key_prefix = config.telemetry_key_prefix
+        self.file_format = config.telemetry_format
+
+        # Each run writes under its own key, so parts of earlier runs never mix in
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self.run_prefix = f"{self.key_prefix}/{self.run_id}"
+
+        # Preallocated buffers, one array per column
+        self.buffers = {name: np.empty(self.capacity, dtype=dtype) for name, (dtype, _) in COLUMNS.items()}
+        self._reset_buffers()
+        self._row = -1
+        self._size = 0
+        self._part = 0
+
+    def _reset_buffers(self):
+        """Заполняет буферы значениями по умолчанию"""
+        for name, (_, default) in COLUMNS.items():
+            self.buffers[name][:] = default
+
+    def begin_bar(self, end_time, bar, bar_index, pre_volume, volume_high, volume_checked, current_qty):
+        """Открывает новую строку для бара (bar может отсутствовать)"""
+        if self._size == self.capacity:
+            self.flush()
+
+        row = self._size
+        self.buffers['time'][row] = np.datetime64(end_time.replace(tzinfo=None), 'ns')
+        self.buffers['bar_index'][row] = bar_index
+        if bar is not None:
+            self.buffers['open'][row] = bar.open
+            self.buffers['close'][row] = bar.close
+        self.buffers['pre_volume'][row] = pre_volume
+        self.buffers['volume_high'][row] = volume_high
+        self.buffers['volume_checked'][row] = volume_checked
+        self.buffers['current_qty'][row] = current_qty
+
+        self._row = row
+        self._size += 1
+
+    def record_indicators(self, indicators):
+        """Сохраняет значения индикаторов в текущую строку"""
+        if self._row < 0 or not indicators.all_indicators_ready():
+            return
+
+        row = self._row
+        self.buffers['atr'][row] = indicators._atr.current.value
+        self.buffers['avg_atr'][row] = indicators._avg_atr.current.value
+        self.buffers['adx'][row] = indicators._adx.current.value
+        self.buffers['st_low'][row] = indicators._str_low.current.value
+        self.buffers['st_high'][row] = indicators._str_high.current.value
+        self.buffers['sar_low'][row] = indicators._sar_low.current.value
+        self.buffers['sar_high'][row] = indicators._sar_high.current.value
+        self.buffers['rsi'][row] = indicators._rsi.current.value
+        self.buffers['bb_lower'][row] = indicators._bb.lower_band.current.value
+        self.buffers['bb_upper'][row] = indicators._bb.upper_band.current.value
+
+    def record_gate(self, gate):
+        """Отмечает проверку, на которой бар был отброшен"""
+        if self._row >= 0:
+            self.buffers['gate'][self._row] = gate
+
+    def record_signals(self, signals, is_trending):
+        """Сохраняет флаги сигналов"""
+        if self._row < 0:
+            return
+
+        row = self._row
+        self.buffers['is_trending'][row] = is_trending
+        for name in SIGNAL_COLUMNS:
+            self.buffers[name][row] = signals[name]
+
+    def record_action(self, action):
+        """Добавляет флаги выполненных действий"""
+        if self._row >= 0:
+            self.buffers['action'][self._row] |= action
+
+    def flush(self):
+        """Сбрасывает заполненную часть буферов в Object Store"""
+        if self._size == 0:
+            return
+
+        columns = {name: buffer[:self._size] for name, buffer in self.buffers.items()}
+        stream = io.BytesIO()
+        if self.file_format == "parquet":
+            import pandas as pd
+            pd.DataFrame(columns).to_parquet(stream, index=False)
+        else:
+            records = np.empty(self._size, dtype=[(name, dtype) for name, (dtype, _) in COLUMNS.items()])
+            for name, values in columns.items():
+                records[name] = values
+            np.save(stream, records, allow_pickle=False)
+
+        key = f"{self.run_prefix}/part-{self._part:05d}.{self.file_format}"
+        self.algo.object_store.save_bytes(key, bytearray(stream.getvalue()))
+
+        if self.config.debug_flags:
+            self.algo.debug(f"TELEMETRY FLUSH: {self._size} rows -> {key}")
+
+        self._part += 1
+        self._size = 0
+        self._row = -1
+        self._reset_buffers()
+        self._save_manifest()
+
+    def _save_manifest(self):
+        """Сохраняет манифест запуска и указатель на последний запуск"""
+        manifest = {'run_id': self.run_id, 'parts': self._part, 'format': self.file_format}
+        self.algo.object_store.save(f"{self.run_prefix}/manifest.json", json.dumps(manifest))
+        self.algo.object_store.save(f"{self.key_prefix}/latest", self.run_id)
+
+
+def load_telemetry(object_store, key_prefix="telemetry", run_id=None):
+    """Читает части телеметрии запуска по манифесту (по умолчанию последний запуск)"""
+    if run_id is None:
+        latest_key = f"{key_prefix}/latest"
+        if not object_store.contains_key(latest_key):
+            return {name: np.empty(0, dtype=dtype) for name, (dtype, _) in COLUMNS.items()}
+        run_id = object_store.read(latest_key)
+
+    manifest = json.loads(object_store.read(f"{key_prefix}/{run_id}/manifest.json"))
+    file_format = manifest['format']
+
+    parts = []
+    for part in range(manifest['parts']):
+        key = f"{key_prefix}/{run_id}/part-{part:05d}.{file_format}"
+        stream = io.BytesIO(bytes(object_store.read_bytes(key)))
+        if file_format == "parquet":
+            import pandas as pd
+            frame = pd.read_parquet(stream)
+            parts.append({name: frame[name].to_numpy() for name in COLUMNS})
+        else:
+            records = np.load(stream, allow_pickle=False)
+            parts.append({name: records[name] for name in COLUMNS})
+
+    if not parts:
+        return {name: np.empty(0, dtype=dtype) for name, (dtype, _) in COLUMNS.items()}
+    return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
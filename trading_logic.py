@@ -1,5 +1,17 @@
 from AlgorithmImports import *
 
+# === Actions returned by execute_entries/execute_exits (bit flags, several may fire on one bar) ===
+ACTION_NONE = 0
+ACTION_ENTER_TREND_LONG = 1
+ACTION_ENTER_MR_LONG = 2
+ACTION_ENTER_TREND_SHORT = 4
+ACTION_ENTER_MR_SHORT = 8
+ACTION_ENTRY_CANCELLED = 16
+ACTION_EXIT_LONG = 32
+ACTION_EXIT_SHORT = 64
+ACTION_MR_LONG_TIMEOUT = 128
+ACTION_MR_SHORT_TIMEOUT = 256
+
 class TradingLogic:
     def __init__(self, algorithm, config, indicators):
         self.algo = algorithm
@@ -99,7 +111,7 @@ class TradingLogic:
         }
 
     def execute_entries(self, signals, current_qty, volume_high, bar_index, contract_symbol):
-        """Выполняет входы в позицию"""
+        """Выполняет входы в позицию, возвращает флаги действий"""
         # Размеры позиций
         qty = self.config.high_volume_qty if volume_high else self.config.low_volume_qty
         mean_rev_qty = qty
@@ -108,16 +120,16 @@ class TradingLogic:
         if (signals['trend_long'] or signals['mean_rev_long']) and current_qty == 0:
             # ДОПОЛНИТЕЛЬНАЯ ПРОВЕРКА перед входом
             if not self.algo.can_trade_symbol(contract_symbol):
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"ОТМЕНА ВХОДА - СИМВОЛ НЕ ГОТОВ: {contract_symbol}")
-                return
+                return ACTION_ENTRY_CANCELLED
                 
             if signals['mean_rev_long']:
                 self._long_mr_bar_index = bar_index
                 self.position_entry_price = signals['price']
                 self.position_type = 'mr_long'
                 
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"ENTERING MR LONG | Price={signals['price']:.2f} | Qty={mean_rev_qty} | ADX={self.indicators._adx.current.value:.2f}")
                 
                 ticket = self.algo.market_order(contract_symbol, mean_rev_qty)
@@ -125,12 +137,13 @@ class TradingLogic:
                     self._entry_ticket_id = ticket.order_id
                     self._mr_entry_tickets[ticket.order_id] = True
                     self.active_orders[ticket.order_id] = f"MR_LONG_ENTRY_{mean_rev_qty}"
+                return ACTION_ENTER_MR_LONG
 
             else:  # trend_long
                 self.position_entry_price = signals['price']
                 self.position_type = 'trend_long'
                 
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"ENTERING TREND LONG | Price={signals['price']:.2f} | Qty={qty} | ADX={self.indicators._adx.current.value:.2f}")
                 
                 ticket = self.algo.market_order(contract_symbol, qty)
@@ -138,21 +151,22 @@ class TradingLogic:
                     self._entry_ticket_id = ticket.order_id
                     self._trend_tickets[ticket.order_id] = True
                     self.active_orders[ticket.order_id] = f"TREND_LONG_ENTRY_{qty}"
+                return ACTION_ENTER_TREND_LONG
 
         # ВХОДЫ В ПОЗИЦИЮ - SHORT
         elif (signals['trend_short'] or signals['mean_rev_short']) and current_qty == 0:
             # ДОПОЛНИТЕЛЬНАЯ ПРОВЕРКА перед входом
             if not self.algo.can_trade_symbol(contract_symbol):
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"ОТМЕНА ВХОДА - СИМВОЛ НЕ ГОТОВ: {contract_symbol}")
-                return
+                return ACTION_ENTRY_CANCELLED
                 
             if signals['mean_rev_short']:
                 self._short_mr_bar_index = bar_index
                 self.position_entry_price = signals['price']
                 self.position_type = 'mr_short'
                 
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"ENTERING MR SHORT | Price={signals['price']:.2f} | Qty={-mean_rev_qty} | ADX={self.indicators._adx.current.value:.2f}")
                 
                 ticket = self.algo.market_order(contract_symbol, -mean_rev_qty)
@@ -160,12 +174,13 @@ class TradingLogic:
                     self._entry_ticket_id = ticket.order_id
                     self._mr_entry_tickets[ticket.order_id] = True
                     self.active_orders[ticket.order_id] = f"MR_SHORT_ENTRY_{-mean_rev_qty}"
+                return ACTION_ENTER_MR_SHORT
                 
             else:  # trend_short
                 self.position_entry_price = signals['price']
                 self.position_type = 'trend_short'
                 
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"ENTERING TREND SHORT | Price={signals['price']:.2f} | Qty={-qty} | ADX={self.indicators._adx.current.value:.2f}")
                 
                 ticket = self.algo.market_order(contract_symbol, -qty)
@@ -173,45 +188,56 @@ class TradingLogic:
                     self._entry_ticket_id = ticket.order_id
                     self._trend_tickets[ticket.order_id] = True
                     self.active_orders[ticket.order_id] = f"TREND_SHORT_ENTRY_{-qty}"
+                return ACTION_ENTER_TREND_SHORT
+
+        return ACTION_NONE
 
     def execute_exits(self, signals, current_qty, bar_index, contract_symbol):
-        """Выполняет выходы из позиции"""
+        """Выполняет выходы из позиции, возвращает флаги действий"""
+        action = ACTION_NONE
+
         # ВЫХОДЫ ИЗ ПОЗИЦИИ
         if current_qty > 0:
             should_exit = not signals['trend_long'] and not signals['mean_rev_long']
-            if should_exit and self.config.debug_trades:
+            if should_exit and self.config.debug_trades and self.config.debug_bars:
                 self.algo.debug(f"EXITING LONG | Reason: TrendLong={signals['trend_long']}, MRLong={signals['mean_rev_long']}")
             if should_exit and self.algo.can_trade_symbol(contract_symbol):
                 self.algo.liquidate(contract_symbol)
                 self._long_mr_bar_index = None
+                action |= ACTION_EXIT_LONG
 
         if current_qty < 0:
             should_exit = not signals['trend_short'] and not signals['mean_rev_short']
-            if should_exit and self.config.debug_trades:
+            if should_exit and self.config.debug_trades and self.config.debug_bars:
                 self.algo.debug(f"EXITING SHORT | Reason: TrendShort={signals['trend_short']}, MRShort={signals['mean_rev_short']}")
             if should_exit and self.algo.can_trade_symbol(contract_symbol):
                 self.algo.liquidate(contract_symbol)
                 self._short_mr_bar_index = None
+                action |= ACTION_EXIT_SHORT
 
         # Таймауты для MR (bar-based)
         if self._long_mr_bar_index is not None and current_qty > 0:
             elapsed_bars = bar_index - self._long_mr_bar_index
             if elapsed_bars >= self.config.max_bars_in_trade:
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"MR LONG TIMEOUT | Elapsed bars: {elapsed_bars}")
                 if self.algo.can_trade_symbol(contract_symbol):
                     self.algo.liquidate(contract_symbol)
+                    action |= ACTION_MR_LONG_TIMEOUT
                 self._long_mr_bar_index = None
 
         if self._short_mr_bar_index is not None and current_qty < 0:
             elapsed_bars = bar_index - self._short_mr_bar_index
             if elapsed_bars >= self.config.max_bars_in_trade:
-                if self.config.debug_trades:
+                if self.config.debug_trades and self.config.debug_bars:
                     self.algo.debug(f"MR SHORT TIMEOUT | Elapsed bars: {elapsed_bars}")
                 if self.algo.can_trade_symbol(contract_symbol):
                     self.algo.liquidate(contract_symbol)
+                    action |= ACTION_MR_SHORT_TIMEOUT
                 self._short_mr_bar_index = None
 
+        return action
+
     def debug_trade_stats(self):
         """Выводит статистику сделок"""
         if self.config.debug_trades and self.trade_counter > 0: